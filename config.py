@@ -9,8 +9,9 @@ CSV_ENCODING = "cp932"
 
 # --- 取引先名 → 出力用表示名マッピング ---
 # ※ キーは株式会社・㈱除去後の名前で登録する（自動除去されてから検索される）
+# ※ 全角英数字・全角スペースは半角に変換されてから検索される
 PARTNER_DISPLAY_MAP = {
-    "SCSK　Minoriソリューションズ": "Minoriソリューションズ",
+    "SCSK Minoriソリューションズ": "Minoriソリューションズ",
     "TISW": "TIS西日本",
     "NTTデータ フィナンシャルテクノロジー": "NFT",
     "ジェーエムエーシステムズ": "JMAS",
@@ -54,6 +55,7 @@ SALES_PARTNER_MAP = {
 
 # --- 顧客名（ユーザー名）名寄せマッピング ---
 # ※ キーは株式会社・㈱除去後の名前で登録する（自動除去されてから検索される）
+# ※ 全角英数字・全角スペースは半角に変換されてから検索される
 CLIENT_DISPLAY_MAP = {
     "シーイーシー": "CEC",
     "ヴェオリア・ジェネッツ": "ヴェオリアジェネッツ",
@@ -1,5 +1,7 @@
 """構成図自動生成 - エントリーポイント"""
+import os
 import sys
+from fnmatch import fnmatch
 from pathlib import Path
 
 # プロジェクトルートをパスに追加
@@ -13,7 +15,13 @@ from src.writer import generate
 
 def _find_csv(pattern: str) -> Path:
     """inputフォルダからパターンに一致するCSVを1件検索する。"""
-    csv_files = sorted(config.CSV_DIR.glob(pattern))
+    csv_files = []
+    if config.CSV_DIR.is_dir():
+        # DirEntry は readdir 時の種別情報を持つため、is_file() で追加の stat が発生しない
+        with os.scandir(config.CSV_DIR) as it:
+            csv_files = sorted(
+                Path(e.path) for e in it if fnmatch(e.name, pattern) and e.is_file()
+            )
     if not csv_files:
         print(f"エラー: {config.CSV_DIR} に {pattern} が見つかりません")
         sys.exit(1)
@@ -1,11 +1,14 @@
 """データ加工モジュール - グルーピング・集計・ソート"""
+import sys
+
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass, field
 
 import config
 
 
-@dataclass
+@dataclass(slots=True)
 class Member:
     """社員1名分の情報"""
     name: str
@@ -14,95 +17,122 @@ class Member:
     is_bp: bool
 
 
-@dataclass
+# Project / Client / Partner / Division の人数・行数は生成時に1度だけ計算する。
+# 子要素のリストは生成前に確定させ、生成後は変更しないこと。
+
+
+@dataclass(slots=True)
 class Project:
     """案件（業務）"""
     name: str
     members: list[Member] = field(default_factory=list)
+    count: int = field(init=False)
+    # 案件名行 + メンバー行数
+    row_height: int = field(init=False)
 
-    @property
-    def count(self) -> int:
-        return len(self.members)
-
-    def row_height(self) -> int:
-        """案件名行 + メンバー行数。"""
-        return 1 + self.count
+    def __post_init__(self):
+        self.count = len(self.members)
+        self.row_height = 1 + self.count
 
 
-@dataclass
+@dataclass(slots=True)
 class Client:
     """顧客（ユーザー）"""
     name: str
     projects: list[Project] = field(default_factory=list)
+    count: int = field(init=False)
+    # この顧客ブロックがExcel上で占める行数（顧客名行 + 空行 + 案件ブロック群）
+    row_height: int = field(init=False)
 
-    @property
-    def count(self) -> int:
-        return sum(p.count for p in self.projects)
+    def __post_init__(self):
+        self.count = sum(p.count for p in self.projects)
+        self.row_height = 1 + 1 + sum(p.row_height for p in self.projects)
 
-    def row_height(self) -> int:
-        """この顧客ブロックがExcel上で占める行数を返す。
 
-        顧客名行 + 空行 + 案件ブロック群。
-        """
-        project_rows = sum(p.row_height() for p in self.projects)
-        return 1 + 1 + project_rows
-
-
-@dataclass
+@dataclass(slots=True)
 class Partner:
     """取引先（出力用表示名で集約）"""
     display_name: str
     clients: list[Client] = field(default_factory=list)
+    count: int = field(init=False)
+    # この取引先ブロック全体がExcel上で占める行数（取引先名行 + 空行 + 顧客ブロック群）
+    row_height: int = field(init=False)
 
-    @property
-    def count(self) -> int:
-        return sum(c.count for c in self.clients)
-
-    def row_height(self) -> int:
-        """この取引先ブロック全体がExcel上で占める行数を返す。
+    def __post_init__(self):
+        self.count = sum(c.count for c in self.clients)
+        self.row_height = 1 + 1 + sum(c.row_height for c in self.clients)
 
-        取引先名行 + 空行 + 顧客ブロック群。
-        """
-        client_rows = sum(c.row_height() for c in self.clients)
-        return 1 + 1 + client_rows
 
-
-@dataclass
+@dataclass(slots=True)
 class Division:
     """営業区分（A, B, C, ...）"""
     key: str
     partners: list[Partner] = field(default_factory=list)
+    count: int = field(init=False)
+
+    def __post_init__(self):
+        self.count = sum(p.count for p in self.partners)
+
+
+# 全角英数字・全角スペース → 半角変換テーブル
+_ZEN2HAN = str.maketrans({
+    **{c: c - 0xFEE0
+       for r in (range(0xFF10, 0xFF1A),     # ０-９
+                 range(0xFF21, 0xFF3B),     # Ａ-Ｚ
+                 range(0xFF41, 0xFF5B))     # ａ-ｚ
+       for c in r},
+    0x3000: 0x20,                           # 全角スペース
+})
 
-    @property
-    def count(self) -> int:
-        return sum(p.count for p in self.partners)
 
+# 営業区分マップの逆引き（取引先名 → 営業区分）
+_DIVISION_LOOKUP = {
+    name: div_key
+    for div_key, partners in config.SALES_PARTNER_MAP.items()
+    for name in partners
+}
 
-# 全角英数字 → 半角変換テーブル
-_ZEN2HAN = str.maketrans(
-    {chr(c): chr(c - 0xFEE0)
-     for c in range(0xFF01, 0xFF5F)
-     if 0xFF10 <= c <= 0xFF19      # ０-９
-     or 0xFF21 <= c <= 0xFF3A      # Ａ-Ｚ
-     or 0xFF41 <= c <= 0xFF5A}     # ａ-ｚ
-)
 
+# 営業区分 → 表示順（SALES_PARTNER_MAP の登録順、未登録は末尾）
+_DIV_ORDER = {div_key: i for i, div_key in enumerate(config.SALES_PARTNER_MAP)}
+_DIV_ORDER_UNK = len(_DIV_ORDER)
 
-def _strip_company(name: str) -> str:
-    """会社名から株式会社・㈱を除去し、全角英数字を半角に変換する。"""
-    for s in ("株式会社", "㈱"):
-        name = name.replace(s, "")
-    name = name.translate(_ZEN2HAN)
-    return name.strip()
+# グレード → ソート順（未登録グレードは末尾）
+_GRADE_RANK = {grade: i for i, grade in enumerate(config.GRADE_ORDER)}
+_GRADE_UNK = len(config.GRADE_ORDER)
 
 
-def _resolve_display_name(partner_name: str) -> str:
-    """取引先名から出力用表示名を返す。
+def _strip_company_series(names: pd.Series) -> pd.Series:
+    """会社名列から株式会社・㈱を除去し、全角英数字・全角スペースを半角に変換する。
+
+    列全体を pandas の文字列演算で一括処理する。
+    """
+    return (
+        names.str.replace("株式会社", "", regex=False)
+        .str.replace("㈱", "", regex=False)
+        .str.translate(_ZEN2HAN)
+        .str.strip()
+    )
+
+
+def _resolve_names(names: pd.Series, display_map: dict) -> pd.Series:
+    """会社名列を正規化し、マッピングを適用した列を返す。
+
+    取引先名・顧客名は行数に比べて種類が少ないため、
+    重複を除いた値だけを変換してから元の行に展開する。
+    """
+    codes, uniques = pd.factorize(names)
+    stripped = _strip_company_series(pd.Series(uniques))
+    resolved = stripped.map(display_map).fillna(stripped)
+    return resolved.take(codes).set_axis(names.index)
+
+
+def _resolve_display_names(partner_names: pd.Series) -> pd.Series:
+    """取引先名列から出力用表示名の列を返す。
 
     株式会社・㈱を除去してからマッピングを検索する。
     """
-    stripped = _strip_company(partner_name)
-    return config.PARTNER_DISPLAY_MAP.get(stripped, stripped)
+    return _resolve_names(partner_names, config.PARTNER_DISPLAY_MAP)
 
 
 def _is_bp(dept: str) -> bool:
@@ -110,53 +140,80 @@ def _is_bp(dept: str) -> bool:
     return dept.startswith("B推")
 
 
-def _grade_sort_key(grade: str) -> int:
-    """グレードのソート順を返す。"""
-    try:
-        return config.GRADE_ORDER.index(grade)
-    except ValueError:
-        return len(config.GRADE_ORDER)
-
-
 def _sort_members(members: list[Member]) -> list[Member]:
     """役員 → 自社社員（グレード順）→ BP社員の順にソートする。"""
-    exec_ = [m for m in members if not m.is_bp and "役員" in m.dept]
-    own = [m for m in members if not m.is_bp and "役員" not in m.dept]
-    bp = [m for m in members if m.is_bp]
-    own.sort(key=lambda m: _grade_sort_key(m.grade))
+    exec_, own, bp = [], [], []
+    for m in members:
+        if m.is_bp:
+            bp.append(m)
+        elif "役員" in m.dept:
+            exec_.append(m)
+        else:
+            own.append(m)
+    own.sort(key=lambda m: _GRADE_RANK.get(m.grade, _GRADE_UNK))
     return exec_ + own + bp
 
 
-def _resolve_client_name(name: str) -> str:
-    """顧客名（ユーザー名）の名寄せ。
+def _resolve_client_names(names: pd.Series) -> pd.Series:
+    """顧客名（ユーザー名）列の名寄せ。
 
     株式会社・㈱を除去してからマッピングを検索する。
     """
-    stripped = _strip_company(name)
-    return config.CLIENT_DISPLAY_MAP.get(stripped, stripped)
+    return _resolve_names(names, config.CLIENT_DISPLAY_MAP)
 
 
 def _build_clients(client_df: pd.DataFrame) -> list[Client]:
-    """DataFrameからClient一覧を構築する。"""
-    client_df = client_df.copy()
-    client_df["出力用ユーザー名"] = client_df["ユーザー名"].apply(_resolve_client_name)
+    """DataFrameからClient一覧を構築する。
+
+    client_df には名寄せ済みの「出力用ユーザー名」列が付与されていること。
+    顧客 → 案件 の出現順に並べ替えた後、案件キーが切り替わる位置を
+    numpy で求め、その区間ごとに Client / Project を組み立てる。
+    """
+    users = client_df["出力用ユーザー名"]
+
+    # groupby(sort=False) と同じ出現順を保つため、出現順の連番で安定ソートする
+    sub = client_df.assign(
+        _顧客順=pd.factorize(users)[0],
+        _案件順=client_df.groupby([users, client_df["業務名"]], sort=False).ngroup(),
+    ).sort_values(["_顧客順", "_案件順"], kind="stable")
+
+    client_codes = sub["_顧客順"].to_numpy()
+    project_codes = sub["_案件順"].to_numpy()
+    user_arr, proj_arr, name_arr, dept_arr, grade_arr = (
+        sub[col].to_numpy()
+        for col in ("出力用ユーザー名", "業務名", "名前", "所属部署", "グレード")
+    )
+    # 案件（顧客 × 業務名）が切り替わる行位置で区切る
+    bounds = np.flatnonzero(np.diff(project_codes, prepend=-1)).tolist()
+    bounds.append(len(sub))
+
+    # 顧客 → 案件 → メンバー の入れ子リストに振り分ける
+    tree = []
+    prev_client = -1
+    for start, end in zip(bounds, bounds[1:]):
+        if client_codes[start] != prev_client:
+            projects = []
+            tree.append((user_arr[start], projects))
+            prev_client = client_codes[start]
+        members = []
+        for name, dept, grade in zip(name_arr[start:end], dept_arr[start:end], grade_arr[start:end]):
+            bp = _is_bp(dept)
+            # 所属部署・グレードは重複が多いため intern して同一オブジェクトを共有する
+            members.append(Member(
+                name=name,
+                dept=sys.intern(dept),
+                grade=sys.intern(config.GRADE_DISPLAY_MAP.get(grade, grade)) if not bp else "",
+                is_bp=bp,
+            ))
+        projects.append((proj_arr[start], members))
+
+    # 子要素が確定してから Project / Client を生成する
     clients = []
-    for client_name, cdf in client_df.groupby("出力用ユーザー名", sort=False):
-        projects = []
-        for proj_name, pdf in cdf.groupby("業務名", sort=False):
-            members = []
-            for _, row in pdf.iterrows():
-                bp = _is_bp(row["所属部署"])
-                members.append(Member(
-                    name=row["名前"],
-                    dept=row["所属部署"],
-                    grade=config.GRADE_DISPLAY_MAP.get(row["グレード"], row["グレード"]) if not bp else "",
-                    is_bp=bp,
-                ))
-            members = _sort_members(members)
-            projects.append(Project(name=proj_name, members=members))
-        projects.sort(key=lambda p: p.count, reverse=True)
-        clients.append(Client(name=client_name, projects=projects))
+    for client_name, projects in tree:
+        built = [Project(name=proj_name, members=_sort_members(members))
+                 for proj_name, members in projects]
+        built.sort(key=lambda p: p.count, reverse=True)
+        clients.append(Client(name=sys.intern(client_name), projects=built))
     clients.sort(key=lambda c: c.count, reverse=True)
     return clients
 
@@ -167,38 +224,31 @@ def process(df: pd.DataFrame) -> list[Division]:
     階層: Division → Partner → Client → Project → Member
     営業区分でグルーピングし、キー昇順でソートして返す。
     """
-    df = df.copy()
-
-    # 出力用取引先名を付与
-    df["出力用取引先名"] = df["取引先名"].apply(_resolve_display_name)
-
-    # 営業区分マップを逆引き（取引先名 → 営業区分）に変換
-    division_lookup = {}
-    for div_key, partners in config.SALES_PARTNER_MAP.items():
-        for name in partners:
-            division_lookup[name] = div_key
-    df["営業区分"] = df["出力用取引先名"].map(division_lookup).fillna("")
+    # 出力用取引先名・営業区分は元のDataFrameに列追加せず、同じindexのSeriesとして持つ
+    # 種類が少ないためカテゴリ型にし、groupby を整数コードで行わせる
+    partner_display = _resolve_display_names(df["取引先名"])
+    division = partner_display.map(_DIVISION_LOOKUP).fillna("").astype("category")
+    partner_display = partner_display.astype("category")
 
     # Division → Partner → Client の順にグルーピング
-    divisions: dict[str, Division] = {}
-
-    for (div_key, partner_display), group_df in df.groupby(
-        ["営業区分", "出力用取引先名"], sort=False
-    ):
-        if div_key not in divisions:
-            divisions[div_key] = Division(key=div_key)
-
-        clients = _build_clients(group_df)
-        partner = Partner(display_name=partner_display, clients=clients)
-        divisions[div_key].partners.append(partner)
+    partners_by_div: dict[str, list[Partner]] = {}
+
+    # 各グループは行位置だけを受け取り、必要な列だけを取り出して渡す
+    cols = df[["業務名", "名前", "所属部署", "グレード"]].assign(
+        出力用ユーザー名=_resolve_client_names(df["ユーザー名"]),
+    )
+    groups = df.groupby([division, partner_display], sort=False, observed=True).indices
+    for (div_key, partner_display_name), positions in groups.items():
+        clients = _build_clients(cols.take(positions))
+        partner = Partner(display_name=sys.intern(partner_display_name), clients=clients)
+        partners_by_div.setdefault(sys.intern(div_key), []).append(partner)
 
     # 各営業区分内の取引先を人数降順にソート
-    for div in divisions.values():
-        div.partners.sort(key=lambda p: p.count, reverse=True)
+    divisions = []
+    for div_key, partners in partners_by_div.items():
+        partners.sort(key=lambda p: p.count, reverse=True)
+        divisions.append(Division(key=div_key, partners=partners))
 
     # SALES_PARTNER_MAP の登録順でソート（未登録＝空文字キーは末尾）
-    map_keys = list(config.SALES_PARTNER_MAP.keys())
-    return [divisions[k] for k in sorted(
-        divisions.keys(),
-        key=lambda k: (k not in config.SALES_PARTNER_MAP, map_keys.index(k) if k in config.SALES_PARTNER_MAP else 0),
-    )]
+    divisions.sort(key=lambda d: _DIV_ORDER.get(d.key, _DIV_ORDER_UNK))
+    return divisions
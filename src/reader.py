@@ -2,6 +2,13 @@
 import pandas as pd
 from pathlib import Path
 
+# pyarrow がインストールされていれば、マルチスレッドの pyarrow CSV リーダーを使う
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
 
 def read_csv(csv_path: Path, encoding: str = "cp932") -> pd.DataFrame:
     """社員情報CSVを読み込みDataFrameとして返す。
@@ -11,9 +18,11 @@ def read_csv(csv_path: Path, encoding: str = "cp932") -> pd.DataFrame:
             社員番号, 名前, 所属部署, 業務コード,
             ユーザー名, 取引先名, 業務名, 状況, 役職, グレード
     """
-    df = pd.read_csv(csv_path, encoding=encoding, dtype=str)
+    if _HAS_PYARROW:
+        df = pd.read_csv(csv_path, encoding=encoding,
+                         engine="pyarrow", dtype="string[pyarrow]")
+    else:
+        df = pd.read_csv(csv_path, encoding=encoding, dtype="string")
     df = df.fillna("")
     # 前後の空白を除去
-    for col in df.columns:
-        df[col] = df[col].str.strip()
-    return df
+    return df.apply(lambda s: s.str.strip())
@@ -3,13 +3,20 @@
 ビジュアルカラムの列構成:
   取引先 | 顧客 | 案件名 | 名前 | 部署 | グレード
 """
+from array import array
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
-from openpyxl.worksheet.pagebreak import Break
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.dimensions import ColumnDimension
+from openpyxl.worksheet.pagebreak import Break, RowBreak, ColBreak
+from openpyxl.worksheet.worksheet import Worksheet
 
 import config
 from src.processor import Division, Partner, Client, Project, Member
@@ -23,6 +30,10 @@ EXCEL_COLS_PER_VISUAL = 7  # 取引先 | 顧客 | 案件名 | 名前 | 所属 |
 GAP_COLS = 1
 STRIDE = EXCEL_COLS_PER_VISUAL + GAP_COLS
 
+# 1ページあたりのビジュアルカラム数・1カラムあたりの最大行数
+_COLS_PER_PAGE = config.LAYOUT["columns_per_page"]
+_MAX_ROWS = config.LAYOUT["max_rows_per_column"]
+
 # 列オフセット（0始まり）
 COL_PARTNER = 0
 COL_CLIENT = 1
@@ -32,6 +43,12 @@ COL_DEPT = 4
 COL_EMPTY = 5
 COL_GRADE = 6
 
+# ビジュアルカラム番号 × 列オフセット → Excel列番号（1始まり、A列はマージン）
+COL_ABS = tuple(
+    tuple(vc * STRIDE + 1 + LEFT_MARGIN + off for off in range(EXCEL_COLS_PER_VISUAL))
+    for vc in range(_COLS_PER_PAGE)
+)
+
 # タイトル行 + 空行
 HEADER_ROWS = 2
 CONTENT_START_ROW = HEADER_ROWS + 1
@@ -40,6 +57,7 @@ CONTENT_START_ROW = HEADER_ROWS + 1
 MEDIUM = Side(style="medium")
 THIN = Side(style="thin")
 HAIR = Side(style="hair")
+_SIDE_NONE = Side()
 
 # 取引先ブロック間の空白行数
 PARTNER_GAP_ROWS = 1
@@ -51,6 +69,7 @@ _COL_WIDTH_MDW = 9
 _COL_WIDTH_PADDING = 7
 
 
+@lru_cache(maxsize=32)
 def _display_to_stored_width(display_width: float) -> float:
     """Excel UI 上の表示幅を XML 格納幅に変換する。
 
@@ -69,17 +88,164 @@ def _make_title_date() -> str:
     return f"R{reiwa_year}年{now.month}月"
 
 
+# config.LAYOUT のフォント設定 dict → Font（設定は import 後に変更されない前提）
+_font_cache: dict[int, Font] = {}
+
+
 def _make_font(font_cfg: dict) -> Font:
-    return Font(**font_cfg)
+    key = id(font_cfg)
+    font = _font_cache.get(key)
+    if font is None:
+        font = _font_cache[key] = Font(**font_cfg)
+    return font
+
+
+# --- 書式オブジェクト（全セルで共有する） ---
+_FONT_TITLE = _make_font(config.LAYOUT["font_title"])
+_FONT_PARTNER = _make_font(config.LAYOUT["font_partner"])
+_FONT_CLIENT = _make_font(config.LAYOUT["font_client"])
+_FONT_PROJECT = _make_font(config.LAYOUT["font_project"])
+_FONT_PERSON = _make_font(config.LAYOUT["font_person"])
+_FONT_INFO = Font(name="ＭＳ Ｐゴシック", size=9, italic=True)
+_ALIGN_CENTER_SHRINK = Alignment(vertical="center", shrink_to_fit=True)
+_ALIGN_SHRINK = Alignment(shrink_to_fit=True)
+_ALIGN_RIGHT = Alignment(horizontal="right")
+
+# 階層ごとのセル書式（フォント + 配置）の NamedStyle 名
+_STYLE_PARTNER = "style_partner"
+_STYLE_CLIENT = "style_client"
+_STYLE_PROJECT = "style_project"
+_STYLE_PERSON_NAME = "style_person_name"
+_STYLE_PERSON_DEPT = "style_person_dept"    # 所属・グレード
+_STYLE_INFO = "style_info"                  # 営業区分・人数
+
+
+def _make_named_styles() -> list[NamedStyle]:
+    """階層ごとのセル書式を NamedStyle として返す。
+
+    NamedStyle はワークブックに紐付くため、ワークブックごとに生成する。
+    """
+    return [
+        NamedStyle(name=_STYLE_PARTNER, font=_FONT_PARTNER, alignment=_ALIGN_CENTER_SHRINK),
+        NamedStyle(name=_STYLE_CLIENT, font=_FONT_CLIENT, alignment=_ALIGN_CENTER_SHRINK),
+        NamedStyle(name=_STYLE_PROJECT, font=_FONT_PROJECT, alignment=_ALIGN_SHRINK),
+        NamedStyle(name=_STYLE_PERSON_NAME, font=_FONT_PERSON, alignment=_ALIGN_SHRINK),
+        NamedStyle(name=_STYLE_PERSON_DEPT, font=_FONT_PERSON),
+        NamedStyle(name=_STYLE_INFO, font=_FONT_INFO, alignment=_ALIGN_RIGHT),
+    ]
+
+# 罫線の種類コード（罫線判定は numpy の整数配列で行う）
+_NONE, _THIN, _HAIR, _MEDIUM = 0, 1, 2, 3
+_SIDE_BY_CODE = (_SIDE_NONE, THIN, HAIR, MEDIUM)
+
+# (上, 下, 左, 右) のコードを2bitずつ詰めた値 → 共有 Border
+_BORDER_BY_CODE = [
+    Border(top=_SIDE_BY_CODE[c >> 6 & 3], bottom=_SIDE_BY_CODE[c >> 4 & 3],
+           left=_SIDE_BY_CODE[c >> 2 & 3], right=_SIDE_BY_CODE[c & 3])
+    for c in range(256)
+]
+
+
+class _CellBuffer:
+    """write-only シートへ行順に書き出すためのセルバッファ。
+
+    write-only モードではセルを行順に append する必要があるため、
+    書き込み中のページ段のセルを行ごとのリスト（列番号 - 1 で添字）で保持し、
+    確定した行から順にそのまま append する。
+    """
+
+    def __init__(self, ws, max_col: int):
+        self.ws = ws
+        self.max_col = max_col
+        self.rows: dict[int, list] = {}
+        self.next_row = 1
+        self.merges: list[tuple[int, int, int, int]] = []
+
+    def _row(self, row: int) -> list:
+        cells = self.rows.get(row)
+        if cells is None:
+            cells = self.rows[row] = [None] * self.max_col
+        return cells
+
+    def cell(self, row: int, column: int):
+        """(row, column) のセルを返す。未作成なら空セルを作成する。"""
+        cells = self._row(row)
+        cell = cells[column - 1]
+        if cell is None:
+            cell = cells[column - 1] = WriteOnlyCell(self.ws)
+        return cell
+
+    def put(self, row: int, column: int, value,
+            style: str = None, font: Font = None):
+        """値を持つセルを (row, column) に新規作成する。
+
+        値セルは罫線より先に書き込まれ、同じ位置に2度書かれることはないため、
+        既存セルの検索を省いて直接登録する。
+        style にはワークブックに登録済みの NamedStyle 名を指定する。
+        """
+        cell = WriteOnlyCell(self.ws, value=value)
+        if style is not None:
+            cell.style = style
+        if font is not None:
+            cell.font = font
+        self._row(row)[column - 1] = cell
+        return cell
+
+    def put_info(self, row: int, column: int, text: str):
+        """営業区分・人数の補足情報セルを (row, column) に新規作成する。"""
+        cell = self._row(row)[column - 1] = WriteOnlyCell(self.ws, value=text)
+        cell.style = _STYLE_INFO
+
+    def put_rows(self, start_row: int, columns, rows):
+        """start_row 行目から1行ずつ値セルをまとめて作成する。
+
+        columns は (列番号, NamedStyle 名) の並び、rows は各行の値の並び。
+        空の値はセルを作らない（罫線が必要なら罫線適用時に作成される）。
+        """
+        ws = self.ws
+        for row, values in enumerate(rows, start_row):
+            cells = self._row(row)
+            for (column, style), value in zip(columns, values):
+                if value:
+                    cell = cells[column - 1] = WriteOnlyCell(ws, value=value)
+                    cell.style = style
+
+    def merge_cells(self, start_row: int, start_column: int,
+                    end_row: int, end_column: int):
+        """セル結合範囲を記録する（シートへの登録は flush_merges でまとめて行う）。"""
+        self.merges.append((start_row, start_column, end_row, end_column))
+
+    def flush_merges(self):
+        """記録したセル結合範囲をシートにまとめて登録する。
+
+        結合範囲は重複せず、write-only シートには結合対象の既存セルもないため、
+        MultiCellRange.add の包含チェックを省き、内部の集合に直接追加する。
+        """
+        self.ws.merged_cells.ranges.update(
+            CellRange(min_row=sr, min_col=sc, max_row=er, max_col=ec)
+            for sr, sc, er, ec in self.merges
+        )
+        self.merges.clear()
+
+    def flush(self, until_row: int):
+        """until_row より前の行をシートへ書き出す。"""
+        while self.next_row < until_row:
+            self.ws.append(self.rows.pop(self.next_row, ()))
+            self.next_row += 1
 
 
 class FlowLayout:
     """フロー型カラムレイアウトエンジン。"""
 
+    __slots__ = (
+        "cells", "cols_per_page", "max_rows", "visual_col", "page", "row",
+        "page_start_row", "page_max_row", "page_break_rows", "_segments",
+    )
+
     def __init__(self, ws):
-        self.ws = ws
-        self.cols_per_page = config.LAYOUT["columns_per_page"]
-        self.max_rows = config.LAYOUT["max_rows_per_column"]
+        self.cells = _CellBuffer(ws, LEFT_MARGIN + _COLS_PER_PAGE * STRIDE)
+        self.cols_per_page = _COLS_PER_PAGE
+        self.max_rows = _MAX_ROWS
 
         self.visual_col = 0
         self.page = 0
@@ -88,22 +254,22 @@ class FlowLayout:
         # ページ段管理（5カラムを超えたら下段＝次の印刷ページへ）
         self.page_start_row = CONTENT_START_ROW
         self.page_max_row = CONTENT_START_ROW
-        self.page_break_rows = []
+        self.page_break_rows = array("i")
 
-    @property
-    def _col_base(self) -> int:
-        """現在のビジュアルカラムの開始Excel列番号（1始まり）。A列はマージン。"""
-        return self.visual_col * STRIDE + 1 + LEFT_MARGIN
+        # 罫線適用待ちのセグメント（_apply_partner_borders の引数）
+        self._segments = []
 
-    def _col(self, offset: int) -> int:
-        """列オフセットからExcel列番号を返す。"""
-        return self._col_base + offset
+    @property
+    def last_row(self) -> int:
+        """現在までに使用した最大行（印刷範囲の最終行）。"""
+        return self.row if self.row > self.page_max_row else self.page_max_row
 
     def can_fit(self, height: int) -> bool:
         return (self.row + height - 1) <= (self.page_start_row + self.max_rows - 1)
 
     def next_column(self):
-        self.page_max_row = max(self.page_max_row, self.row)
+        if self.row > self.page_max_row:
+            self.page_max_row = self.row
         self.visual_col += 1
         self.row = self.page_start_row
         if self.visual_col >= self.cols_per_page:
@@ -116,6 +282,15 @@ class FlowLayout:
             self.page_start_row = break_row + HEADER_ROWS
             self.row = self.page_start_row
             self.page_max_row = self.page_start_row
+            # 前のページ段は確定しているのでシートへ書き出す
+            self.flush(self.page_start_row)
+
+    def flush(self, until_row: int):
+        """保留中のセグメントに罫線を適用し、until_row より前の行を書き出す。"""
+        for segment in self._segments:
+            _apply_partner_borders(self.cells, *segment)
+        self._segments.clear()
+        self.cells.flush(until_row)
 
     def ensure_fit(self, height: int):
         if not self.can_fit(height):
@@ -137,13 +312,7 @@ class FlowLayout:
               ...
         """
         PARTNER_HEADER_ROWS = 2
-
-        font_partner = _make_font(config.LAYOUT["font_partner"])
-        font_client = _make_font(config.LAYOUT["font_client"])
-        font_project = _make_font(config.LAYOUT["font_project"])
-        font_person = _make_font(config.LAYOUT["font_person"])
-        font_info = Font(name="ＭＳ Ｐゴシック", size=9, italic=True)
-        align_right = Alignment(horizontal="right")
+        cells = self.cells
 
         # --- セグメント（カラム内の取引先部分ブロック）管理 ---
         seg = {}
@@ -152,7 +321,9 @@ class FlowLayout:
             """新しいセグメントを開始し、取引先ヘッダーを書き込む。"""
             seg.clear()
             seg["start_row"] = self.row
-            seg["col_base"] = self._col_base
+            # このセグメントの各列オフセットに対応するExcel列番号
+            seg["cols"] = cols = COL_ABS[self.visual_col]
+            seg["col_base"] = cols[COL_PARTNER]
             seg["partner_row"] = self.row
             seg["member_ranges"] = []
             seg["border_starts"] = {}
@@ -163,39 +334,25 @@ class FlowLayout:
 
             # 取引先名（右5列 + 下1行をセル結合）
             pr = self.row
-            cell = self.ws.cell(
-                row=pr, column=self._col(COL_PARTNER),
-                value=partner.display_name,
-            )
-            cell.font = font_partner
-            cell.alignment = Alignment(vertical="center", shrink_to_fit=True)
-            self.ws.merge_cells(
-                start_row=pr, start_column=self._col(COL_PARTNER),
-                end_row=pr + 1, end_column=self._col(COL_PARTNER + 5),
+            cells.put(pr, cols[COL_PARTNER], partner.display_name,
+                      style=_STYLE_PARTNER)
+            cells.merge_cells(
+                start_row=pr, start_column=cols[COL_PARTNER],
+                end_row=pr + 1, end_column=cols[COL_PARTNER + 5],
             )
             seg["merged_rows"].add(pr)
 
             # 担当営業名（上段 COL_GRADE）
-            cell_div = self.ws.cell(
-                row=pr, column=self._col(COL_GRADE),
-                value=f"営業:{division_key}",
-            )
-            cell_div.font = font_info
-            cell_div.alignment = align_right
+            cells.put_info(pr, cols[COL_GRADE], f"営業:{division_key}")
 
             # 人数合計（下段 COL_GRADE）
-            cell_cnt = self.ws.cell(
-                row=pr + 1, column=self._col(COL_GRADE),
-                value=f"{partner.count}名",
-            )
-            cell_cnt.font = font_info
-            cell_cnt.alignment = align_right
+            cells.put_info(pr + 1, cols[COL_GRADE], f"{partner.count}名")
 
             self.row += PARTNER_HEADER_ROWS
             seg["border_starts"][self.row] = COL_CLIENT
 
         def _end_segment():
-            """現セグメントの罫線を適用して閉じる。"""
+            """現セグメントを閉じ、罫線の適用を flush() まで保留する。"""
             if not seg:
                 return
             end_row = self.row - 1
@@ -203,23 +360,21 @@ class FlowLayout:
                 return
             col_base = seg["col_base"]
             col_end = col_base + EXCEL_COLS_PER_VISUAL - 1
-            _apply_partner_borders(
-                self.ws, seg["start_row"], end_row, col_base, col_end,
+            self._segments.append((
+                seg["start_row"], end_row, col_base, col_end,
                 seg["member_ranges"], seg["border_starts"],
-                seg["merged_rows"],
-                partner_row=seg["partner_row"],
-                client_vline_ranges=seg["client_vline_ranges"],
-                project_vline_ranges=seg["project_vline_ranges"],
-            )
+                seg["merged_rows"], seg["partner_row"],
+                seg["client_vline_ranges"], seg["project_vline_ranges"],
+            ))
 
         # --- 最初のセグメント開始 ---
-        first_h = partner.clients[0].row_height() if partner.clients else 0
+        first_h = partner.clients[0].row_height if partner.clients else 0
         self.ensure_fit(PARTNER_HEADER_ROWS + first_h)
         _begin_segment()
 
         # --- 顧客ブロックを順に書き込み ---
         for client in partner.clients:
-            client_h = client.row_height()
+            client_h = client.row_height
 
             # 現カラムに収まらなければセグメントを閉じて改カラム
             if not self.can_fit(client_h):
@@ -228,89 +383,68 @@ class FlowLayout:
                 self.ensure_fit(PARTNER_HEADER_ROWS + client_h)
                 _begin_segment()
 
+            # セグメント内で共通の列番号・記録先をローカルに取り出す
+            cols = seg["cols"]
+            col_client, col_project, col_empty, col_grade = (
+                cols[COL_CLIENT], cols[COL_PROJECT], cols[COL_EMPTY], cols[COL_GRADE])
+            member_columns = ((cols[COL_NAME], _STYLE_PERSON_NAME),
+                              (cols[COL_DEPT], _STYLE_PERSON_DEPT),
+                              (col_grade, _STYLE_PERSON_DEPT))
+            border_starts = seg["border_starts"]
             if not seg["first_client"]:
-                seg["border_starts"][self.row] = COL_CLIENT
+                border_starts[self.row] = COL_CLIENT
             seg["first_client"] = False
 
             # 顧客名（col6まで + 下1行をセル結合）
             client_row = self.row
-            cell_c = self.ws.cell(
-                row=client_row, column=self._col(COL_CLIENT),
-                value=client.name,
-            )
-            cell_c.font = font_client
-            cell_c.alignment = Alignment(vertical="center", shrink_to_fit=True)
-            self.ws.merge_cells(
-                start_row=client_row, start_column=self._col(COL_CLIENT),
-                end_row=client_row + 1, end_column=self._col(COL_EMPTY),
+            cells.put(client_row, col_client, client.name, style=_STYLE_CLIENT)
+            cells.merge_cells(
+                start_row=client_row, start_column=col_client,
+                end_row=client_row + 1, end_column=col_empty,
             )
             seg["merged_rows"].add(client_row)
 
             # 顧客人数合計（下段 COL_GRADE）
-            cell_cc = self.ws.cell(
-                row=client_row + 1, column=self._col(COL_GRADE),
-                value=f"{client.count}名",
-            )
-            cell_cc.font = font_info
-            cell_cc.alignment = align_right
+            cells.put_info(client_row + 1, col_grade, f"{client.count}名")
 
             self.row += 2  # 顧客名行 + 空行（結合に含まれる）
-            seg["border_starts"][self.row] = COL_PROJECT
+            border_starts[self.row] = COL_PROJECT
 
             for pi, project in enumerate(client.projects):
                 if pi > 0:
-                    seg["border_starts"][self.row] = COL_PROJECT
+                    border_starts[self.row] = COL_PROJECT
 
                 # 案件名（col6までセル結合）
                 proj_row = self.row
-                cell_p = self.ws.cell(
-                    row=proj_row, column=self._col(COL_PROJECT),
-                    value=project.name,
-                )
-                cell_p.font = font_project
-                cell_p.alignment = Alignment(shrink_to_fit=True)
-                self.ws.merge_cells(
-                    start_row=proj_row, start_column=self._col(COL_PROJECT),
-                    end_row=proj_row, end_column=self._col(COL_EMPTY),
+                cells.put(proj_row, col_project, project.name, style=_STYLE_PROJECT)
+                cells.merge_cells(
+                    start_row=proj_row, start_column=col_project,
+                    end_row=proj_row, end_column=col_empty,
                 )
 
                 # 案件人数（COL_GRADE）
-                cell_pc = self.ws.cell(
-                    row=proj_row, column=self._col(COL_GRADE),
-                    value=f"{project.count}名",
-                )
-                cell_pc.font = font_info
-                cell_pc.alignment = align_right
+                cells.put_info(proj_row, col_grade, f"{project.count}名")
 
                 self.row += 1  # 案件名行
-                seg["border_starts"][self.row] = COL_NAME
+                border_starts[self.row] = COL_NAME
 
                 # メンバー（案件名の直下）
                 first_member_row = self.row
-                for member in project.members:
-                    r = self.row
-                    cell_n = self.ws.cell(
-                        row=r, column=self._col(COL_NAME),
-                        value=member.name,
-                    )
-                    cell_n.font = font_person
-                    cell_n.alignment = Alignment(shrink_to_fit=True)
-                    self.ws.cell(
-                        row=r, column=self._col(COL_DEPT),
-                        value=member.dept,
-                    ).font = font_person
-                    if not member.is_bp and member.grade:
-                        self.ws.cell(
-                            row=r, column=self._col(COL_GRADE),
-                            value=member.grade,
-                        ).font = font_person
-                    self.row += 1
+                # 名前・所属・グレードの列ごとの値を並べ、行単位でまとめて書き込む
+                cells.put_rows(
+                    first_member_row,
+                    member_columns,
+                    zip([m.name for m in project.members],
+                        [m.dept for m in project.members],
+                        [m.grade if not m.is_bp else "" for m in project.members]),
+                )
+                self.row += project.count
                 last_member_row = self.row - 1
                 if project.count >= 2:
                     seg["member_ranges"].append(
                         (first_member_row, last_member_row))
                     for mr in range(first_member_row + 1, last_member_row + 1):
-                        seg["border_starts"][mr] = COL_NAME
+                        border_starts[mr] = COL_NAME
 
                 # col3 右縦罫線: 案件名の1行下からメンバー最終行まで
                 if project.count >= 1:
@@ -328,35 +462,7 @@ class FlowLayout:
         self.row += PARTNER_GAP_ROWS
 
 
-def _is_member_pair(row_a: int, row_b: int, member_ranges: list) -> bool:
-    """row_a と row_b が同一案件のメンバー行同士かを判定する。"""
-    for first, last in member_ranges:
-        if first <= row_a <= last and first <= row_b <= last:
-            return True
-    return False
-
-
-def _resolve_h_border(row_boundary: int, col_offset: int,
-                      member_ranges: list, border_starts: dict) -> Side:
-    """内部の横罫線スタイルを返す。
-
-    row_boundary: 罫線が入る行（上の行と下の行の境界 = 下の行番号）
-    col_offset:   現在の列オフセット（0始まり）
-    """
-    if row_boundary not in border_starts:
-        return Side()  # 罫線なし
-
-    start_col = border_starts[row_boundary]
-    if col_offset < start_col:
-        return Side()  # この列まで罫線は届かない
-
-    # メンバー間は hair、それ以外は thin
-    if _is_member_pair(row_boundary - 1, row_boundary, member_ranges):
-        return HAIR
-    return THIN
-
-
-def _apply_partner_borders(ws, row_start, row_end, col_start, col_end,
+def _apply_partner_borders(cells, row_start, row_end, col_start, col_end,
                            member_ranges: list, border_starts: dict,
                            merged_rows: set, partner_row: int = 0,
                            client_vline_ranges: list = None,
@@ -372,60 +478,57 @@ def _apply_partner_borders(ws, row_start, row_end, col_start, col_end,
     - col1右辺: thin（取引先名セルの2行下から）
     - col2右辺: thin（各顧客名セルの2行下から顧客最終行まで）
     - col3右辺: thin（各案件名セルの1行下からメンバー最終行まで）
+
+    各辺の種類は (行, 列オフセット) の numpy 配列にまとめて判定し、
+    セルごとの処理は共有 Border の参照だけにする。
     """
     if client_vline_ranges is None:
         client_vline_ranges = []
     if project_vline_ranges is None:
         project_vline_ranges = []
-    col_base = col_start
-
-    for row in range(row_start, row_end + 1):
-        for col in range(col_start, col_end + 1):
-            col_offset = col - col_base
-
-            # --- 上辺 ---
-            if row == row_start:
-                top = MEDIUM
-            elif (row - 1) in merged_rows:
-                top = Side()  # 結合セル内部
-            else:
-                top = _resolve_h_border(
-                    row, col_offset, member_ranges, border_starts)
-
-            # --- 下辺 ---
-            if row == row_end:
-                bottom = MEDIUM
-            elif row in merged_rows:
-                bottom = Side()  # 結合セル内部
-            else:
-                bottom = _resolve_h_border(
-                    row + 1, col_offset, member_ranges, border_starts)
-
-            # --- 左辺・右辺 ---
-            left = MEDIUM if col == col_start else Side()
-            right = MEDIUM if col == col_end else Side()
-
-            # col1 右辺: 取引先名の2行下から thin
-            if col_offset == COL_PARTNER and row >= partner_row + 2:
-                right = THIN
-
-            # col2 右辺: 各顧客名の2行下から顧客最終行まで thin
-            if col_offset == COL_CLIENT:
-                for cv_start, cv_end in client_vline_ranges:
-                    if cv_start <= row <= cv_end:
-                        right = THIN
-                        break
-
-            # col3 右辺: 各案件名の1行下からメンバー最終行まで thin
-            if col_offset == COL_PROJECT:
-                for pv_start, pv_end in project_vline_ranges:
-                    if pv_start <= row <= pv_end:
-                        right = THIN
-                        break
-
-            ws.cell(row=row, column=col).border = Border(
-                top=top, bottom=bottom, left=left, right=right,
-            )
+    n_rows = row_end - row_start + 1
+    n_cols = col_end - col_start + 1
+
+    # --- 横罫線: h[k] は (row_start + k) 行目の上辺 = 1つ上の行の下辺 ---
+    h = np.zeros((n_rows + 1, n_cols), dtype=np.uint8)
+    h[0] = h[n_rows] = _MEDIUM
+    # メンバー間（同一案件のメンバー行同士）の境界は hair
+    hair = np.zeros(n_rows + 1, dtype=bool)
+    for first, last in member_ranges:
+        hair[first + 1 - row_start:last + 1 - row_start] = True
+    # 境界ごとの罫線開始列を (row - row_start) で引ける配列に展開する（n_cols は罫線なし）
+    starts = np.full(n_rows + 1, n_cols, dtype=np.intp)
+    rows = np.fromiter(border_starts, dtype=np.intp, count=len(border_starts))
+    start_cols = np.fromiter(border_starts.values(), dtype=np.intp, count=len(border_starts))
+    # 外枠と結合セル内部には内部罫線を引かない
+    inner = ((rows > row_start) & (rows <= row_end)
+             & ~np.isin(rows - 1, np.fromiter(merged_rows, dtype=np.intp)))
+    starts[rows[inner] - row_start] = start_cols[inner]
+    kind = np.where(hair[1:n_rows], _HAIR, _THIN)
+    h[1:n_rows] = np.where(np.arange(n_cols) >= starts[1:n_rows, None], kind[:, None], _NONE)
+
+    # --- 左辺・右辺 ---
+    left = np.zeros(n_cols, dtype=np.uint8)
+    left[0] = _MEDIUM
+    right = np.zeros((n_rows, n_cols), dtype=np.uint8)
+    right[:, -1] = _MEDIUM
+    # col1 右辺: 取引先名の2行下から
+    right[max(partner_row + 2 - row_start, 0):, COL_PARTNER] = _THIN
+    # col2 右辺: 各顧客名の2行下から顧客最終行まで
+    for cv_start, cv_end in client_vline_ranges:
+        right[cv_start - row_start:cv_end - row_start + 1, COL_CLIENT] = _THIN
+    # col3 右辺: 各案件名の1行下からメンバー最終行まで
+    for pv_start, pv_end in project_vline_ranges:
+        right[pv_start - row_start:pv_end - row_start + 1, COL_PROJECT] = _THIN
+
+    codes = (h[:-1] << 6) | (h[1:] << 4) | (left << 2) | right
+    cell = cells.cell
+    border_by_code = _BORDER_BY_CODE
+    for row, row_codes in enumerate(codes.tolist(), start=row_start):
+        for col, code in enumerate(row_codes, start=col_start):
+            # 4辺とも罫線なしのセルは既定の罫線のままなので書き込まない
+            if code:
+                cell(row, col).border = border_by_code[code]
 
 
 def _setup_column_widths(ws, total_visual_cols: int):
@@ -433,28 +536,41 @@ def _setup_column_widths(ws, total_visual_cols: int):
 
     config の値は Excel UI 上の表示幅なので、XML 格納幅に変換して設定する。
     """
-    layout = config.LAYOUT
-    _w = _display_to_stored_width
-
-    # A列（左マージン空列）
-    ws.column_dimensions["A"].width = _w(layout["col_width_margin"])
-
-    for vc in range(total_visual_cols):
-        base = vc * STRIDE + 1 + LEFT_MARGIN
-        ws.column_dimensions[get_column_letter(base + COL_PARTNER)].width = _w(layout["col_width_partner"])
-        ws.column_dimensions[get_column_letter(base + COL_CLIENT)].width = _w(layout["col_width_client"])
-        ws.column_dimensions[get_column_letter(base + COL_PROJECT)].width = _w(layout["col_width_project"])
-        ws.column_dimensions[get_column_letter(base + COL_NAME)].width = _w(layout["col_width_name"])
-        ws.column_dimensions[get_column_letter(base + COL_DEPT)].width = _w(layout["col_width_dept"])
-        ws.column_dimensions[get_column_letter(base + COL_EMPTY)].width = _w(layout["col_width_empty"])
-        ws.column_dimensions[get_column_letter(base + COL_GRADE)].width = _w(layout["col_width_grade"])
-        if GAP_COLS > 0:
-            ws.column_dimensions[get_column_letter(base + EXCEL_COLS_PER_VISUAL)].width = _w(layout["col_width_gap"])
-
-
-def _setup_print(ws, page_break_rows: list, last_row: int):
+    # 設定キー → 格納幅（col_width_* の値ごとに1度だけ変換する）
+    widths = {k: _display_to_stored_width(v)
+              for k, v in config.LAYOUT.items() if k.startswith("col_width_")}
+
+    # 列オフセット → 格納幅（全ビジュアルカラムで共通）
+    offset_widths = [
+        (COL_PARTNER, widths["col_width_partner"]),
+        (COL_CLIENT, widths["col_width_client"]),
+        (COL_PROJECT, widths["col_width_project"]),
+        (COL_NAME, widths["col_width_name"]),
+        (COL_DEPT, widths["col_width_dept"]),
+        (COL_EMPTY, widths["col_width_empty"]),
+        (COL_GRADE, widths["col_width_grade"]),
+    ]
+    if GAP_COLS > 0:
+        offset_widths.append((EXCEL_COLS_PER_VISUAL, widths["col_width_gap"]))
+
+    # 列番号順の格納幅（A列は左マージン空列）
+    col_widths = [widths["col_width_margin"]] * LEFT_MARGIN
+    for _ in range(total_visual_cols):
+        col_widths.extend(width for _, width in offset_widths)
+
+    # 同じ幅が連続する列は1つの <col min max> 範囲にまとめて登録する
+    start = 0
+    for i in range(1, len(col_widths) + 1):
+        if i == len(col_widths) or col_widths[i] != col_widths[start]:
+            letter = get_column_letter(start + 1)
+            ws.column_dimensions[letter] = ColumnDimension(
+                ws, index=letter, min=start + 1, max=i, width=col_widths[start])
+            start = i
+
+
+def _setup_print(ws, page_break_rows, last_row: int):
     """印刷設定（A4横、印刷範囲固定、行ページブレーク）。"""
-    ws.page_setup.paperSize = ws.PAPERSIZE_A4
+    ws.page_setup.paperSize = Worksheet.PAPERSIZE_A4
     ws.page_setup.orientation = "landscape"
     ws.page_setup.scale = 48
 
@@ -468,22 +584,23 @@ def _setup_print(ws, page_break_rows: list, last_row: int):
     ws.page_margins.footer = 0.8 * _CM
 
     # 印刷範囲: A列〜AO列（5カラム分）を1ページ幅として固定
-    last_col_num = LEFT_MARGIN + config.LAYOUT["columns_per_page"] * STRIDE
+    last_col_num = LEFT_MARGIN + _COLS_PER_PAGE * STRIDE
     last_col = get_column_letter(last_col_num)
     ws.print_area = f"A1:{last_col}{last_row}"
 
     # 列方向のページ境界: AO列の次列で区切り、横幅を1ページに固定
-    ws.col_breaks.append(Break(id=last_col_num + 1))
+    ws.col_breaks = ColBreak(brk=[Break(id=last_col_num + 1)])
 
-    for break_row in page_break_rows:
-        ws.row_breaks.append(Break(id=break_row))
+    ws.row_breaks = RowBreak(brk=[Break(id=r) for r in page_break_rows])
 
 
 def generate(divisions: list[Division], output_dir: Path) -> Path:
-    """構成図Excelを生成する。"""
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "構成図"
+    """構成図Excelを生成する。
+
+    write-only モードのワークブックに、確定した行から順に書き出す。
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("構成図")
 
     # Normal style のフォントをＭＳ Ｐゴシックに設定
     # （列幅の解釈に使われる MaxDigitWidth がフォントに依存するため）
@@ -492,27 +609,32 @@ def generate(divisions: list[Division], output_dir: Path) -> Path:
             ns.font = Font(name="ＭＳ Ｐゴシック", size=11)
             break
 
+    # 階層ごとのセル書式を登録（セルには名前で割り当てる）
+    for style in _make_named_styles():
+        wb.add_named_style(style)
+
     # 目盛線を非表示、改ページプレビューで開く
     ws.sheet_view.showGridLines = False
     ws.sheet_view.view = "pageBreakPreview"
 
+    # 列幅（常に5カラム分の列幅を固定）
+    # write-only では最初の行を書き出す前に設定しておく必要がある
+    flow = FlowLayout(ws)
+    _setup_column_widths(ws, flow.cols_per_page)
+
     # タイトル行（1行目は空、2行目にタイトル）
     title = f"【{_make_title_date()}】"
-    ws.cell(row=2, column=1 + LEFT_MARGIN, value=title).font = _make_font(
-        config.LAYOUT["font_title"]
-    )
+    flow.cells.put(2, 1 + LEFT_MARGIN, title, font=_FONT_TITLE)
 
     # フローレイアウトで書き込み
-    flow = FlowLayout(ws)
-
     for division in divisions:
         for partner in division.partners:
             flow.write_partner_clients(partner, division_key=division.key)
 
-    # 列幅・印刷設定（常に5カラム分の列幅を固定）
-    total_visual_cols = flow.cols_per_page
-    _setup_column_widths(ws, total_visual_cols)
-    last_row = max(flow.page_max_row, flow.row)
+    # 残りの行・セル結合を書き出し、印刷設定
+    last_row = flow.last_row
+    flow.flush(last_row + 1)
+    flow.cells.flush_merges()
     _setup_print(ws, flow.page_break_rows, last_row)
 
     # 出力